@@ -44,6 +44,7 @@ ZENDESK_EMAIL = os.getenv('ZENDESK_EMAIL')
 ZENDESK_API_TOKEN = os.getenv('ZENDESK_API_TOKEN')
 ZENDESK_API_URL = os.getenv('ZENDESK_API_URL')
 ZENDESK_SHOULD_CLEAN_DRAFTS = os.getenv('ZENDESK_SHOULD_CLEAN_DRAFTS', 'false').lower() == 'true'
+ZENDESK_DRY_RUN = os.getenv('ZENDESK_DRY_RUN', 'false').lower() == 'true'
 
 CROWDIN_PROJECT_NAME = os.getenv('CROWDIN_PROJECT_NAME')
 CROWDIN_ROOT_FOLDER = os.getenv('CROWDIN_ROOT_FOLDER')
@@ -53,6 +54,22 @@ CROWDIN_API_KEY = os.getenv('CROWDIN_API_KEY')
 # Can contain only language abbreviations supported by Zendesk
 DST_LANGUAGE_ABBRS = map(lambda x: x.strip(), os.getenv('DstLanguages', 'de').split(','))
 
+
+def _get_env_list(name, item_type=unicode):
+    return map(lambda x: item_type(x.strip().decode('utf-8')),
+               filter(lambda x: x.strip(), os.getenv(name, '').split(',')))
+
+
+# Comma-separated lists, which limit flows to the selected part of the Help Center. Everything is included by default
+ZENDESK_INCLUDE_CATEGORY_IDS = _get_env_list('ZENDESK_INCLUDE_CATEGORY_IDS', long)
+ZENDESK_EXCLUDE_CATEGORY_IDS = _get_env_list('ZENDESK_EXCLUDE_CATEGORY_IDS', long)
+ZENDESK_INCLUDE_SECTION_IDS = _get_env_list('ZENDESK_INCLUDE_SECTION_IDS', long)
+ZENDESK_EXCLUDE_SECTION_IDS = _get_env_list('ZENDESK_EXCLUDE_SECTION_IDS', long)
+ZENDESK_INCLUDE_LABELS = _get_env_list('ZENDESK_INCLUDE_LABELS')
+ZENDESK_EXCLUDE_LABELS = _get_env_list('ZENDESK_EXCLUDE_LABELS')
+ZENDESK_INCLUDE_ARTICLE_IDS = _get_env_list('ZENDESK_INCLUDE_ARTICLE_IDS', long)
+ZENDESK_EXCLUDE_ARTICLE_IDS = _get_env_list('ZENDESK_EXCLUDE_ARTICLE_IDS', long)
+
 # Set language abbreviations matching to this dictionary if they are different in Zendesk and Crowdin
 ZENDESK_TO_CROWDIN_LANGUGES_MAPPING = {'en-us': 'en'}
 
@@ -78,6 +95,102 @@ class APIError(Exception):
         return self._error_code
 
 
+class ArticleRecord(object):
+    """Slim article representation, which keeps only the properties needed for flows control.
+
+    Article bodies are intentionally not stored here, since they may be huge and
+    are only needed for a small subset of articles. Use ZendeskAPI.get_article
+    or translations listing to fetch them on demand.
+    """
+
+    __slots__ = ('id', 'section_id', 'title', 'label_names', 'draft', 'source_locale', 'html_url')
+
+    def __init__(self, **properties):
+        for name in self.__slots__:
+            setattr(self, name, properties.get(name))
+
+    @classmethod
+    def from_json(cls, article):
+        return cls(**article)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def update(self, properties):
+        """Only the tracked properties are updated. Anything else, like body, is dropped
+        """
+        for name in self.__slots__:
+            if name in properties:
+                setattr(self, name, properties[name])
+
+
+class HelpCenterScope(object):
+    """Limits flows to the selected part of the Help Center.
+
+    Empty include set means everything is included. Exclusions always win.
+    Article ids also match cloned drafts, whose titles refer to the given original article id.
+    """
+
+    def __init__(self, include_category_ids=(), exclude_category_ids=(), include_section_ids=(),
+                 exclude_section_ids=(), include_labels=(), exclude_labels=(), include_article_ids=(),
+                 exclude_article_ids=()):
+        self._include_category_ids = set(include_category_ids)
+        self._exclude_category_ids = set(exclude_category_ids)
+        self._include_section_ids = set(include_section_ids)
+        self._exclude_section_ids = set(exclude_section_ids)
+        self._include_labels = set(include_labels)
+        self._exclude_labels = set(exclude_labels)
+        self._include_article_ids = set(include_article_ids)
+        self._exclude_article_ids = set(exclude_article_ids)
+
+    @staticmethod
+    def _is_selected(values, include_set, exclude_set):
+        if exclude_set.intersection(values):
+            return False
+        return not include_set or bool(include_set.intersection(values))
+
+    @property
+    def included_article_ids(self):
+        return sorted(self._include_article_ids)
+
+    @property
+    def included_section_ids(self):
+        return sorted(self._include_section_ids)
+
+    @property
+    def has_category_filters(self):
+        return bool(self._include_category_ids or self._exclude_category_ids)
+
+    @property
+    def is_limited(self):
+        return bool(self._include_category_ids or self._exclude_category_ids or
+                    self._include_section_ids or self._exclude_section_ids or
+                    self._include_labels or self._exclude_labels or
+                    self._include_article_ids or self._exclude_article_ids)
+
+    def is_category_id_selected(self, category_id):
+        return self._is_selected([category_id], self._include_category_ids, self._exclude_category_ids)
+
+    def is_section_id_selected(self, section_id):
+        return self._is_selected([section_id], self._include_section_ids, self._exclude_section_ids)
+
+    def is_category_selected(self, category):
+        return self.is_category_id_selected(category['id'])
+
+    def is_section_selected(self, section):
+        return self.is_category_id_selected(section['category_id']) and self.is_section_id_selected(section['id'])
+
+    def is_article_selected(self, article):
+        article_ids = [article['id']]
+        original_article_id = _extract_article_id_from_title(article)
+        if original_article_id is not None:
+            article_ids.append(original_article_id)
+        return self._is_selected(article_ids, self._include_article_ids, self._exclude_article_ids) \
+            and self._is_selected(article['label_names'], self._include_labels, self._exclude_labels)
+
+
 class ZendeskAPI(object):
     # https://developer.zendesk.com/rest_api/docs/help_center/translations#update-translation
 
@@ -194,6 +307,21 @@ class ZendeskAPI(object):
         """
         return self._put('articles/{}.json'.format(article_id), {'article': article_properties})['article']
 
+    def get_category(self, category_id):
+        """https://developer.zendesk.com/rest_api/docs/help_center/categories#show-category
+        """
+        return self._get('categories/{}.json'.format(category_id))['category']
+
+    def get_section(self, section_id):
+        """https://developer.zendesk.com/rest_api/docs/help_center/sections#show-section
+        """
+        return self._get('sections/{}.json'.format(section_id))['section']
+
+    def get_article(self, article_id):
+        """https://developer.zendesk.com/rest_api/docs/help_center/articles#show-article
+        """
+        return self._get('articles/{}.json'.format(article_id))['article']
+
     def list_article_attachments(self, article_id):
         try:
             return self._get('articles/{}/attachments.json'.format(article_id)).get('article_attachments', [])
@@ -383,6 +511,170 @@ class CrowdinAPI(object):
                                 'body': article['body']},
                                expected_article_path)
 
+    def find_file_path(self, file_id, project_info):
+        """
+        :param file_id: the id, which the file name starts with
+        :param project_info: the result of get_project_info call
+        :return: the actual file path in Crowdin or None if there is no such file
+        """
+        return self._lookup_item(file_id, project_info['files'], self.ITEM_TYPE_FILE)
+
+    def download_file_translation(self, file_path, locale):
+        """Exports the single translated file without building the whole project
+
+        :return: the parsed file content
+        """
+        response = requests.get('{}/{}/export-file'.format(self._api_root, self._project_name), {
+            'key': self._token,
+            'file': file_path,
+            'language': locale,
+        })
+        if response.status_code == httplib.OK:
+            return response.json()
+        raise APIError(response.text, response.status_code)
+
+
+class ZendeskMutationPlan(object):
+    """Collects the intended Zendesk writes and coalesces them into fewer API calls.
+
+    Multiple updates of the same article or of the same article translation are merged
+    into a single request and updates of articles scheduled for deletion are dropped.
+    Zendesk API does not accept translations in the article update request, so updates
+    of different locales still require separate calls. This is why publishing makes
+    as many calls as before, while the plan makes its cost visible in advance.
+    The plan keeps the translation bodies it is going to write until it is executed,
+    so they stay in memory for the whole flow duration. This is only the case for
+    cloned, imported and published articles, which is a small subset of the Help Center.
+    Calls are grouped by article (or by the explicitly given group id) and each group
+    is executed completely before the next one starts, so a failure never leaves
+    earlier articles half-processed. Inside a group calls are executed in the following order:
+    creations, translation updates, article updates, deletions.
+    """
+
+    CALL_CREATE_ARTICLE = 'create_article'
+    CALL_UPDATE_TRANSLATION = 'update_article_translation'
+    CALL_UPDATE_ARTICLE = 'update_article'
+    CALL_DELETE_ARTICLE = 'delete_article'
+    CALLS_ORDER = (CALL_CREATE_ARTICLE, CALL_UPDATE_TRANSLATION, CALL_UPDATE_ARTICLE, CALL_DELETE_ARTICLE)
+
+    def __init__(self):
+        self._calls_by_group_id = OrderedDict()
+        self._group_id_by_call_key = {}
+        self._created_articles_count = 0
+
+    def _add_call(self, group_id, call_key, data, merge=None):
+        if call_key in self._group_id_by_call_key:
+            group_calls = self._calls_by_group_id[self._group_id_by_call_key[call_key]]
+            group_calls[call_key] = merge(group_calls[call_key], data)
+            return
+        self._group_id_by_call_key[call_key] = group_id
+        self._calls_by_group_id.setdefault(group_id, OrderedDict())[call_key] = data
+
+    def _remove_call(self, call_key):
+        group_id = self._group_id_by_call_key.pop(call_key, None)
+        if group_id is not None:
+            del self._calls_by_group_id[group_id][call_key]
+
+    def create_article(self, section_id, article_properties, group_id=None):
+        call_key = (self.CALL_CREATE_ARTICLE, self._created_articles_count)
+        self._created_articles_count += 1
+        self._add_call(call_key if group_id is None else group_id, call_key,
+                       (section_id, copy.copy(article_properties)))
+
+    def update_article(self, article_id, article_properties, group_id=None):
+        def merge(previous, current):
+            previous.update(current)
+            return previous
+
+        self._add_call(article_id if group_id is None else group_id,
+                       (self.CALL_UPDATE_ARTICLE, article_id),
+                       copy.copy(article_properties), merge)
+
+    def update_article_translation(self, article_id, locale_abbr, data, should_create_if_missing=False,
+                                   group_id=None):
+        def merge(previous, current):
+            previous[0].update(current[0])
+            return previous[0], previous[1] or current[1]
+
+        self._add_call(article_id if group_id is None else group_id,
+                       (self.CALL_UPDATE_TRANSLATION, article_id, locale_abbr),
+                       (copy.copy(data), should_create_if_missing), merge)
+
+    def delete_article(self, article_id, group_id=None):
+        for call_key in self._group_id_by_call_key.keys():
+            if call_key[0] in (self.CALL_UPDATE_TRANSLATION, self.CALL_UPDATE_ARTICLE) and call_key[1] == article_id:
+                self._remove_call(call_key)
+        self._add_call(article_id if group_id is None else group_id,
+                       (self.CALL_DELETE_ARTICLE, article_id),
+                       None, lambda previous, current: previous)
+
+    def _count_calls(self, call_type=None):
+        return len(filter(lambda x: call_type is None or x[0] == call_type, self._group_id_by_call_key.keys()))
+
+    @property
+    def calls_count(self):
+        return self._count_calls()
+
+    def describe(self):
+        return u'{} Zendesk API write call(s): {} article creation(s), {} translation update(s), ' \
+               u'{} article update(s), {} article deletion(s)'.format(self.calls_count,
+                                                                      self._count_calls(self.CALL_CREATE_ARTICLE),
+                                                                      self._count_calls(self.CALL_UPDATE_TRANSLATION),
+                                                                      self._count_calls(self.CALL_UPDATE_ARTICLE),
+                                                                      self._count_calls(self.CALL_DELETE_ARTICLE))
+
+    @classmethod
+    def _execute_call(cls, zen_api, call_key, data):
+        if call_key[0] == cls.CALL_CREATE_ARTICLE:
+            section_id, article_properties = data
+            return ArticleRecord.from_json(zen_api.create_article(section_id, article_properties))
+        if call_key[0] == cls.CALL_UPDATE_TRANSLATION:
+            _, article_id, locale_abbr = call_key
+            translation_properties, should_create_if_missing = data
+            try:
+                zen_api.update_article_translation(article_id, locale_abbr, translation_properties)
+            except APIError as e:
+                if should_create_if_missing and 'RecordNotFound' in e.message:
+                    zen_api.create_article_translation(article_id, locale_abbr, translation_properties)
+                else:
+                    raise e
+        elif call_key[0] == cls.CALL_UPDATE_ARTICLE:
+            zen_api.update_article(call_key[1], data)
+        elif call_key[0] == cls.CALL_DELETE_ARTICLE:
+            zen_api.delete_article(call_key[1])
+        return None
+
+    def execute(self, zen_api):
+        """Runs the plan
+
+        :param zen_api: ZendeskAPI instance
+        :return: the list of created article records in the same order they were planned
+        """
+        created_articles = []
+        for group_calls in self._calls_by_group_id.itervalues():
+            for call_key in sorted(group_calls.keys(), key=lambda x: self.CALLS_ORDER.index(x[0])):
+                result = self._execute_call(zen_api, call_key, group_calls[call_key])
+                if result is not None:
+                    created_articles.append(result)
+        return created_articles
+
+
+def _run_mutation_plan(zen_api, plan, dry_run):
+    """Executes the plan unless dry run is requested
+
+    :return: the list of created article records. Always empty for dry runs
+    """
+    if plan.calls_count == 0:
+        logger.info(u'No changes have been planned for Zendesk\n')
+        return []
+    if dry_run is True:
+        logger.info(u'Dry run. Planned {}. Nothing has been changed in Zendesk\n'.format(plan.describe()))
+        return []
+    logger.info(u'Executing {}...'.format(plan.describe()))
+    result = plan.execute(zen_api)
+    logger.info(u'Zendesk changes have been successfully applied\n')
+    return result
+
 
 def _find_draft_article(original_article, articles_in_section):
     candidate_articles = filter(lambda x: _is_draft(x) and x['id'] != original_article['id'], articles_in_section)
@@ -400,7 +692,17 @@ def _generate_draft_title(article):
     return article['title']
 
 
-def _clone_article_to_draft(zen_api, src_article):
+def _get_source_locale_body(zen_api, article, translations):
+    """Article records do not keep bodies, so take it from already fetched translations if possible
+    """
+    source_translation = next(itertools.ifilter(lambda x: x['locale'] == article['source_locale'], translations),
+                              None)
+    if source_translation is None:
+        return zen_api.get_article(article['id'])['body']
+    return source_translation['body']
+
+
+def _clone_article_to_draft(zen_api, plan, src_article):
     original_translations = zen_api.list_article_translations(src_article['id'])
     other_locale_abbrs = map(lambda x: x['locale'], original_translations)
     if src_article['source_locale'] in other_locale_abbrs:
@@ -408,7 +710,7 @@ def _clone_article_to_draft(zen_api, src_article):
     cloned_article_data = [{
         'locale': src_article['source_locale'],
         'title': _generate_draft_title(src_article),
-        'body': src_article['body'],
+        'body': _get_source_locale_body(zen_api, src_article, original_translations),
         'draft': True,
     }]
     if not set(DST_LANGUAGE_ABBRS).intersection(set(other_locale_abbrs)):
@@ -425,32 +727,76 @@ def _clone_article_to_draft(zen_api, src_article):
             'body': localized_article['body'],
             'draft': True,
         })
-    cloned_article = zen_api.create_article(src_article['section_id'], {'translations': cloned_article_data})
-    cloned_labels = {'label_names': src_article['label_names']}
-    zen_api.update_article(cloned_article['id'], cloned_labels)
-    cloned_article.update(cloned_labels)
-    _remove_article_labels(zen_api, src_article, DRAFT_MARKER_LABEL)
-    return cloned_article
-
-
-def _sync_top_level_tree_with_crowdin(crowd_api, categories, sections):
-    for category in categories:
+    # Labels are sent together with the article creation request
+    plan.create_article(src_article['section_id'], {'translations': cloned_article_data,
+                                                    'label_names': src_article['label_names']},
+                        group_id=src_article['id'])
+    _remove_article_labels(plan, src_article, DRAFT_MARKER_LABEL)
+
+
+def _sync_top_level_tree_with_crowdin(crowd_api, categories, sections, articles):
+    """Only syncs folders of categories and sections, which contain the given articles
+    """
+    parent_section_ids = set(map(lambda x: x['section_id'], articles))
+    parent_sections = filter(lambda x: x['id'] in parent_section_ids, sections)
+    parent_category_ids = set(map(lambda x: x['category_id'], parent_sections))
+    for category in filter(lambda x: x['id'] in parent_category_ids, categories):
         crowd_api.upload_category(category)
-        sections_in_category = filter(lambda x: x['category_id'] == category['id'], sections)
+        sections_in_category = filter(lambda x: x['category_id'] == category['id'], parent_sections)
         for section in sections_in_category:
             crowd_api.upload_section(category, section)
 
 
-def _sync_article_with_crowdin(crowd_api, categories, sections, article):
+def _sync_article_with_crowdin(zen_api, crowd_api, categories, sections, article):
     parent_section = next(x for x in sections if x['id'] == article['section_id'])
     parent_category = next(x for x in categories if x['id'] == parent_section['category_id'])
-    article_to_export = copy.copy(article)
+    # The body is only fetched for the article being exported and released right after the upload
+    article_to_export = {'id': article['id'],
+                         'title': article['title'],
+                         'body': zen_api.get_article(article['id'])['body']}
     original_article_id = _extract_article_id_from_title(article_to_export)
     if original_article_id is not None:
         article_to_export['title'] = _restore_original_title(article_to_export)
     crowd_api.upload_article(parent_category, parent_section, article_to_export, original_article_id)
 
 
+def _get_existing_items(getter, item_ids, item_name):
+    result = []
+    for item_id in item_ids:
+        try:
+            result.append(getter(item_id))
+        except APIError as e:
+            if e.error_code != httplib.NOT_FOUND:
+                raise e
+            logger.warning(u'Cannot find Zendesk {} with id "{}". Skipping...'.format(item_name, item_id))
+    return result
+
+
+def _list_scoped_tree(zen_api, scope):
+    section_ids = None
+    if scope.included_article_ids:
+        # Cloned drafts always live in the same section as their original articles.
+        # Zendesk has no lighter article lookup, so the body of each included article is
+        # fetched once here and dropped right away
+        section_ids = set(map(lambda x: x['section_id'],
+                              _get_existing_items(zen_api.get_article, scope.included_article_ids, u'article')))
+    elif scope.included_section_ids:
+        section_ids = set(scope.included_section_ids)
+    if section_ids is not None:
+        sections = filter(scope.is_section_selected,
+                          _get_existing_items(zen_api.get_section, sorted(section_ids), u'section'))
+        categories = map(zen_api.get_category, sorted(set(map(lambda x: x['category_id'], sections))))
+        return categories, sections
+    categories = filter(scope.is_category_selected, zen_api.list_categories())
+    sections = filter(scope.is_section_selected,
+                      reduce(lambda a, b: a + zen_api.list_sections(b['id']), categories, []))
+    return categories, sections
+
+
+def _list_article_records(zen_api, sections):
+    return reduce(lambda a, b: a + map(ArticleRecord.from_json, zen_api.list_articles(b['id'])), sections, [])
+
+
 def _extract_article_id_from_title(article):
     match = CLONED_DRAFT_TITLE_PATTERN.search(article['title'])
     return long(match.group(1)) if match else None
@@ -461,34 +807,103 @@ def _extract_article_id_from_filename(fname):
     return long(match.group(1)) if match else None
 
 
-def _import_translation_to_zendesk(zen_api, lang_abbr, path, dst_article):
-    with codecs.open(path, 'r', 'utf-8') as fd:
-        translated_article = json.load(fd, encoding='utf-8')
-        translated_article['draft'] = True
+def _import_translation_to_zendesk(plan, lang_abbr, translated_article, dst_article):
+    translated_article['draft'] = True
+    plan.update_article_translation(dst_article['id'], lang_abbr, translated_article,
+                                    should_create_if_missing=True)
+    dst_article.update(translated_article)
+    return dst_article
+
+
+def _import_translations_from_archive(crowd_api, plan, draft_articles):
+    processed_article_by_id = OrderedDict()
+    crowd_api.export_translations()
+    for dst_language_abbr in DST_LANGUAGE_ABBRS:
+        language_abbr_in_crowdin = ZENDESK_TO_CROWDIN_LANGUGES_MAPPING.get(dst_language_abbr, dst_language_abbr)
+        root = crowd_api.download_translations(language_abbr_in_crowdin)
         try:
-            zen_api.update_article_translation(dst_article['id'], lang_abbr, translated_article)
-        except APIError as e:
-            if 'RecordNotFound' in e.message:
-                zen_api.create_article_translation(dst_article['id'], lang_abbr, translated_article)
-            else:
-                raise e
-        dst_article.update(translated_article)
-        return dst_article
+            for current_root, dirs, files in os.walk(root):
+                for fname in files:
+                    full_path = os.path.join(current_root, fname)
+                    article_id = _extract_article_id_from_filename(fname)
+                    if article_id is None:
+                        # logger.info('Cannot parse id from {}. Skipping...\n'.format(full_path))
+                        continue
+                    dst_article = next(itertools.ifilter(
+                        lambda x: _extract_article_id_from_title(x) == article_id or long(x['id']) == article_id,
+                        draft_articles), None)
+                    if dst_article is None:
+                        if dst_article is None:
+                            logger.warning(
+                                u'Cannot find Zendesk draft with id "{}" for {}. Skipping...\n'.format(article_id,
+                                                                                                       full_path)
+                            )
+                            continue
+                    logger.info(u'Importing {} (locale {})...'.format(full_path.replace(root, ''), dst_language_abbr))
+                    with codecs.open(full_path, 'r', 'utf-8') as fd:
+                        translated_article = json.load(fd, encoding='utf-8')
+                    _import_translation_to_zendesk(plan, dst_language_abbr, translated_article, dst_article)
+                    logger.info(u'Planned update of draft article "{}" for locale "{}" at {}\n'.
+                                format(dst_article['title'], dst_language_abbr, dst_article['html_url']))
+                    processed_article_by_id[dst_article['id']] = dst_article
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return processed_article_by_id.values()
 
 
-def create_zendesk_drafts(zen_api):
-    candidate_articles = zen_api.find_articles({'label_names': DRAFT_MARKER_LABEL})
+def _import_translations_by_file(crowd_api, plan, draft_articles):
+    processed_article_by_id = OrderedDict()
+    # Files are matched by id, like in the archive, so renamed articles and folders are still found
+    project_info = crowd_api.get_project_info()
+    for dst_article in draft_articles:
+        original_article_id = _extract_article_id_from_title(dst_article)
+        file_path = crowd_api.find_file_path(dst_article['id'] if original_article_id is None else original_article_id,
+                                             project_info)
+        if file_path is None:
+            logger.warning(u'Cannot find Crowdin file for the draft article "{}" at {}. Skipping...\n'.
+                           format(dst_article['title'], dst_article['html_url']))
+            continue
+        for dst_language_abbr in DST_LANGUAGE_ABBRS:
+            language_abbr_in_crowdin = ZENDESK_TO_CROWDIN_LANGUGES_MAPPING.get(dst_language_abbr, dst_language_abbr)
+            logger.info(u'Importing {} (locale {})...'.format(file_path, dst_language_abbr))
+            try:
+                translated_article = crowd_api.download_file_translation(file_path, language_abbr_in_crowdin)
+            except APIError as e:
+                if e.error_code != httplib.NOT_FOUND:
+                    raise e
+                logger.warning(u'Cannot find Crowdin file for the draft article "{}" at {}. Skipping...\n'.
+                               format(dst_article['title'], dst_article['html_url']))
+                continue
+            _import_translation_to_zendesk(plan, dst_language_abbr, translated_article, dst_article)
+            logger.info(u'Planned update of draft article "{}" for locale "{}" at {}\n'.
+                        format(dst_article['title'], dst_language_abbr, dst_article['html_url']))
+            processed_article_by_id[dst_article['id']] = dst_article
+    return processed_article_by_id.values()
+
+
+def create_zendesk_drafts(zen_api, dry_run=False, scope=None):
+    scope = HelpCenterScope() if scope is None else scope
+    candidate_articles = filter(scope.is_article_selected,
+                                map(ArticleRecord.from_json,
+                                    zen_api.find_articles({'label_names': DRAFT_MARKER_LABEL})))
+    candidate_articles = filter(lambda x: scope.is_section_id_selected(x['section_id']), candidate_articles)
+    if candidate_articles and scope.has_category_filters:
+        # Only the sections of found candidates need to be resolved to their categories
+        category_id_by_section_id = {section_id: zen_api.get_section(section_id)['category_id']
+                                     for section_id in set(map(lambda x: x['section_id'], candidate_articles))}
+        candidate_articles = filter(lambda x: scope.is_category_id_selected(category_id_by_section_id[x['section_id']]),
+                                    candidate_articles)
     if candidate_articles:
         logger.info(u'Found {} article(s) ready for making drafts'.format(len(candidate_articles)))
     else:
         logger.info(u'No articles found to make drafts from')
         return []
     articles_by_section_id = {}
-    processed_articles = []
+    plan = ZendeskMutationPlan()
     for candidate_article in candidate_articles:
         if candidate_article['section_id'] not in articles_by_section_id:
             articles_by_section_id[candidate_article['section_id']] = \
-                zen_api.list_articles(candidate_article['section_id'])
+                map(ArticleRecord.from_json, zen_api.list_articles(candidate_article['section_id']))
         cloned_article = _find_draft_article(candidate_article,
                                              articles_by_section_id[candidate_article['section_id']])
         if cloned_article is not None:
@@ -499,12 +914,13 @@ def create_zendesk_drafts(zen_api):
                                   DRAFT_MARKER_LABEL,
                                   candidate_article['html_url']))
             continue
-        logger.info(u'Creating draft for the article "{}" at {}...'.format(candidate_article['title'],
+        logger.info(u'Planning draft for the article "{}" at {}...'.format(candidate_article['title'],
                                                                            candidate_article['html_url']))
-        draft_article = _clone_article_to_draft(zen_api, candidate_article)
+        _clone_article_to_draft(zen_api, plan, candidate_article)
+    processed_articles = _run_mutation_plan(zen_api, plan, dry_run)
+    for draft_article in processed_articles:
         logger.info(u'Successfully created draft article "{}" at {}'.format(draft_article['title'],
                                                                             draft_article['html_url']))
-        processed_articles.append(draft_article)
     return processed_articles
 
 
@@ -512,69 +928,48 @@ def _is_draft(article):
     return article['draft'] is True and DRAFT_MARKER_LABEL in article['label_names']
 
 
-def export_zendesk_drafts_to_crowdin(zen_api, crowd_api):
-    all_categories = zen_api.list_categories()
-    all_sections = reduce(lambda a, b: a + zen_api.list_sections(b['id']), all_categories, [])
-    logger.info(u'Synchronizing folder structure with Crowdin...')
-    _sync_top_level_tree_with_crowdin(crowd_api, all_categories, all_sections)
-    logger.info(u'Folder structure synchronization is completed\n')
-    all_articles = reduce(lambda a, b: a + zen_api.list_articles(b['id']), all_sections, [])
-    draft_articles = filter(_is_draft, all_articles)
+def export_zendesk_drafts_to_crowdin(zen_api, crowd_api, scope=None):
+    scope = HelpCenterScope() if scope is None else scope
+    all_categories, all_sections = _list_scoped_tree(zen_api, scope)
+    all_articles = _list_article_records(zen_api, all_sections)
+    draft_articles = filter(lambda x: _is_draft(x) and scope.is_article_selected(x), all_articles)
     if draft_articles:
         logger.info(u'Found {} draft article(s) to export\n'.format(len(draft_articles), pformat(draft_articles)))
     else:
         logger.info(u'No draft articles found. Nothing to export')
         return []
+    logger.info(u'Synchronizing folder structure with Crowdin...')
+    _sync_top_level_tree_with_crowdin(crowd_api, all_categories, all_sections, draft_articles)
+    logger.info(u'Folder structure synchronization is completed\n')
     processed_articles = []
     for draft_article in draft_articles:
         logger.info(u'Exporting article "{}" from {}...'.format(draft_article['title'],
                                                                 draft_article['html_url']))
-        _sync_article_with_crowdin(crowd_api, all_categories, all_sections, draft_article)
+        _sync_article_with_crowdin(zen_api, crowd_api, all_categories, all_sections, draft_article)
         processed_articles.append(draft_article)
         logger.info(u'The article "{}" has been successfully exported to Crowdin at https://crowdin.com/project/{}\n'.
                     format(draft_article['title'], crowd_api.project_name))
     return processed_articles
 
 
-def import_drafts_from_crowdin_to_zendesk(crowd_api, zen_api):
-    all_categories = zen_api.list_categories()
-    all_sections = reduce(lambda a, b: a + zen_api.list_sections(b['id']), all_categories, [])
-    all_articles = reduce(lambda a, b: a + zen_api.list_articles(b['id']), all_sections, [])
-    draft_articles = filter(_is_draft, all_articles)
+def import_drafts_from_crowdin_to_zendesk(crowd_api, zen_api, dry_run=False, scope=None):
+    scope = HelpCenterScope() if scope is None else scope
+    all_categories, all_sections = _list_scoped_tree(zen_api, scope)
+    all_articles = _list_article_records(zen_api, all_sections)
+    draft_articles = filter(lambda x: _is_draft(x) and scope.is_article_selected(x), all_articles)
     if not draft_articles:
         logger.info(u'No draft articles have been found. Nothing to import\n')
         return []
-    processed_article_by_id = OrderedDict()
-    crowd_api.export_translations()
-    for dst_language_abbr in DST_LANGUAGE_ABBRS:
-        language_abbr_in_crowdin = ZENDESK_TO_CROWDIN_LANGUGES_MAPPING.get(dst_language_abbr, dst_language_abbr)
-        root = crowd_api.download_translations(language_abbr_in_crowdin)
-        try:
-            for current_root, dirs, files in os.walk(root):
-                for fname in files:
-                    full_path = os.path.join(current_root, fname)
-                    article_id = _extract_article_id_from_filename(fname)
-                    if article_id is None:
-                        # logger.info('Cannot parse id from {}. Skipping...\n'.format(full_path))
-                        continue
-                    dst_article = next(itertools.ifilter(
-                        lambda x: _extract_article_id_from_title(x) == article_id or long(x['id']) == article_id,
-                        draft_articles), None)
-                    if dst_article is None:
-                        if dst_article is None:
-                            logger.warning(
-                                u'Cannot find Zendesk draft with id "{}" for {}. Skipping...\n'.format(article_id,
-                                                                                                       full_path)
-                            )
-                            continue
-                    logger.info(u'Importing {} (locale {})...'.format(full_path.replace(root, ''), dst_language_abbr))
-                    _import_translation_to_zendesk(zen_api, dst_language_abbr, full_path, dst_article)
-                    logger.info(u'Successfully updated draft article "{}" for locale "{}" at {}\n'.
-                                format(dst_article['title'], dst_language_abbr, dst_article['html_url']))
-                    processed_article_by_id[dst_article['id']] = dst_article
-        finally:
-            shutil.rmtree(root, ignore_errors=True)
-    return processed_article_by_id.values()
+    plan = ZendeskMutationPlan()
+    if scope.is_limited:
+        # Only the files of selected drafts are fetched instead of the whole project archive
+        processed_articles = _import_translations_by_file(crowd_api, plan, draft_articles)
+    else:
+        processed_articles = _import_translations_from_archive(crowd_api, plan, draft_articles)
+    _run_mutation_plan(zen_api, plan, dry_run)
+    if dry_run is True:
+        return []
+    return processed_articles
 
 
 def _find_original_article(draft_article, all_articles):
@@ -593,12 +988,13 @@ def _restore_original_title(article):
     return result
 
 
-def _remove_article_labels(zen_api, article, labels_to_remove):
+def _remove_article_labels(plan, article, labels_to_remove):
     if isinstance(labels_to_remove, basestring):
         labels_to_remove = [labels_to_remove]
     result_labels = filter(lambda x: x not in labels_to_remove, article['label_names'])
     if len(result_labels) != len(article['label_names']):
-        return zen_api.update_article(article['id'], {'label_names': result_labels})
+        plan.update_article(article['id'], {'label_names': result_labels})
+        article.update({'label_names': result_labels})
     return article
 
 
@@ -615,7 +1011,7 @@ def _is_draft_different_from_original(draft_translations, original_translations)
     return False
 
 
-def _publish_draft_article(zen_api, draft_src_article, original_article, should_clean_draft):
+def _publish_draft_article(zen_api, plan, draft_src_article, original_article, should_clean_draft):
     draft_translations = zen_api.list_article_translations(draft_src_article['id'])
     other_locale_abbrs = map(lambda x: x['locale'], draft_translations)
     if draft_src_article['source_locale'] in other_locale_abbrs:
@@ -636,57 +1032,73 @@ def _publish_draft_article(zen_api, draft_src_article, original_article, should_
             return None
         logger.info(u'Replacing...')
         source_locale_properties = {'title': _restore_original_title(draft_src_article),
-                                    'body': draft_src_article['body'],
+                                    'body': _get_source_locale_body(zen_api, draft_src_article, draft_translations),
                                     'draft': False}
-        zen_api.update_article_translation(original_article['id'], original_article['source_locale'],
-                                           source_locale_properties)
+        plan.update_article_translation(original_article['id'], original_article['source_locale'],
+                                        source_locale_properties)
         original_article.update(source_locale_properties)
         for locale_abbr in common_locale_abbrs:
             src_translation = next(x for x in draft_translations if x['locale'] == locale_abbr)
-            zen_api.update_article_translation(original_article['id'], locale_abbr,
-                                               {'title': src_translation['title'],
-                                                'body': src_translation['body'],
-                                                'draft': False})
-        original_article = _remove_article_labels(zen_api, original_article, DRAFT_MARKER_LABEL)
+            plan.update_article_translation(original_article['id'], locale_abbr,
+                                            {'title': src_translation['title'],
+                                             'body': src_translation['body'],
+                                             'draft': False})
+        original_article = _remove_article_labels(plan, original_article, DRAFT_MARKER_LABEL)
         if should_clean_draft is True:
-            logger.info(u'Removed obsolete draft article "{}" at {}'.format(draft_src_article['title'],
-                                                                            draft_src_article['html_url']))
-            zen_api.delete_article(draft_src_article['id'])
+            logger.info(u'Obsolete draft article "{}" at {} will be removed'.format(draft_src_article['title'],
+                                                                                    draft_src_article['html_url']))
+            plan.delete_article(draft_src_article['id'], group_id=original_article['id'])
         else:
             logger.info(u'Draft articles removal is disabled. Keeping "{}" at {}'.format(draft_src_article['title'],
                                                                                          draft_src_article['html_url']))
         return original_article
     source_locale_properties = {'title': _restore_original_title(draft_src_article),
                                 'draft': False}
-    zen_api.update_article_translation(draft_src_article['id'], draft_src_article['source_locale'],
-                                       source_locale_properties)
+    plan.update_article_translation(draft_src_article['id'], draft_src_article['source_locale'],
+                                    source_locale_properties)
     draft_src_article.update(source_locale_properties)
     for locale_abbr in common_locale_abbrs:
-        zen_api.update_article_translation(draft_src_article['id'], locale_abbr, {'draft': False})
-    return _remove_article_labels(zen_api, draft_src_article, DRAFT_MARKER_LABEL)
+        plan.update_article_translation(draft_src_article['id'], locale_abbr, {'draft': False})
+    return _remove_article_labels(plan, draft_src_article, DRAFT_MARKER_LABEL)
 
 
-def publish_zendesk_drafts(zen_api, should_clean_drafts):
-    all_categories = zen_api.list_categories()
-    all_sections = reduce(lambda a, b: a + zen_api.list_sections(b['id']), all_categories, [])
-    all_articles = reduce(lambda a, b: a + zen_api.list_articles(b['id']), all_sections, [])
-    draft_articles = filter(_is_draft, all_articles)
+def publish_zendesk_drafts(zen_api, should_clean_drafts, dry_run=False, scope=None):
+    scope = HelpCenterScope() if scope is None else scope
+    all_categories, all_sections = _list_scoped_tree(zen_api, scope)
+    all_articles = _list_article_records(zen_api, all_sections)
+    draft_articles = filter(lambda x: _is_draft(x) and scope.is_article_selected(x), all_articles)
     if draft_articles:
         logger.info(u'Found {} draft article(s) to publish\n'.format(len(draft_articles)))
     else:
         logger.info(u'No draft articles found. Nothing to publish\n')
         return []
     published_articles = []
+    plan = ZendeskMutationPlan()
     for draft_article in draft_articles:
-        logger.info(u'Publishing draft article "{}" at {}...'.format(draft_article['title'],
-                                                                     draft_article['html_url']))
+        logger.info(u'Planning publication of draft article "{}" at {}...'.format(draft_article['title'],
+                                                                                  draft_article['html_url']))
         original_article = _find_original_article(draft_article, all_articles)
-        published_article = _publish_draft_article(zen_api, draft_article, original_article, should_clean_drafts)
+        original_article_id = _extract_article_id_from_title(draft_article)
+        if original_article is None and original_article_id is not None:
+            # The original article might be located outside of the crawled sections
+            try:
+                original_article = ArticleRecord.from_json(zen_api.get_article(original_article_id))
+            except APIError as e:
+                if e.error_code != httplib.NOT_FOUND:
+                    logger.warning(u'Cannot verify the original article {} of the draft "{}" at {}: {}. Skipping...\n'.
+                                   format(original_article_id, draft_article['title'], draft_article['html_url'],
+                                          e.message))
+                    continue
+        published_article = _publish_draft_article(zen_api, plan, draft_article, original_article,
+                                                   should_clean_drafts)
         if published_article is not None:
-            # noinspection PyUnresolvedReferences
-            logger.info(u'Successfully published the draft as "{}" at {}\n'.format(published_article['title'],
-                                                                                   published_article['html_url']))
             published_articles.append(published_article)
+    _run_mutation_plan(zen_api, plan, dry_run)
+    if dry_run is True:
+        return []
+    for published_article in published_articles:
+        logger.info(u'Successfully published the draft as "{}" at {}\n'.format(published_article['title'],
+                                                                               published_article['html_url']))
     return published_articles
 
 
@@ -694,15 +1106,26 @@ if __name__ == '__main__':
     zendesk_api = ZendeskAPI(ZENDESK_API_URL, ZENDESK_EMAIL, ZENDESK_API_TOKEN)
     crowdin_api = CrowdinAPI(CROWDIN_API_URL, CROWDIN_PROJECT_NAME, CROWDIN_API_KEY, CROWDIN_ROOT_FOLDER)
 
+    help_center_scope = HelpCenterScope(include_category_ids=ZENDESK_INCLUDE_CATEGORY_IDS,
+                                        exclude_category_ids=ZENDESK_EXCLUDE_CATEGORY_IDS,
+                                        include_section_ids=ZENDESK_INCLUDE_SECTION_IDS,
+                                        exclude_section_ids=ZENDESK_EXCLUDE_SECTION_IDS,
+                                        include_labels=ZENDESK_INCLUDE_LABELS,
+                                        exclude_labels=ZENDESK_EXCLUDE_LABELS,
+                                        include_article_ids=ZENDESK_INCLUDE_ARTICLE_IDS,
+                                        exclude_article_ids=ZENDESK_EXCLUDE_ARTICLE_IDS)
+
     processed_items = []
     if CURRENT_FLOW_MODE == 'Create Drafts In Zendesk':
-        processed_items = create_zendesk_drafts(zendesk_api)
+        processed_items = create_zendesk_drafts(zendesk_api, ZENDESK_DRY_RUN, help_center_scope)
     elif CURRENT_FLOW_MODE == 'Export Zendesk Drafts To Crowdin':
-        processed_items = export_zendesk_drafts_to_crowdin(zendesk_api, crowdin_api)
+        processed_items = export_zendesk_drafts_to_crowdin(zendesk_api, crowdin_api, help_center_scope)
     elif CURRENT_FLOW_MODE == 'Import Crowdin Translations To Zendesk Drafts':
-        processed_items = import_drafts_from_crowdin_to_zendesk(crowdin_api, zendesk_api)
+        processed_items = import_drafts_from_crowdin_to_zendesk(crowdin_api, zendesk_api, ZENDESK_DRY_RUN,
+                                                                help_center_scope)
     elif CURRENT_FLOW_MODE == 'Publish Zendesk Drafts':
-        processed_items = publish_zendesk_drafts(zendesk_api, ZENDESK_SHOULD_CLEAN_DRAFTS)
+        processed_items = publish_zendesk_drafts(zendesk_api, ZENDESK_SHOULD_CLEAN_DRAFTS, ZENDESK_DRY_RUN,
+                                                 help_center_scope)
     else:
         raise AttributeError(u'Unknown flow mode "{}"'.format(CURRENT_FLOW_MODE))
 